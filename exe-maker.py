@@ -16,11 +16,13 @@
 #     limitations under the License.
 #
 
+import array
 import sys
 import os
 import subprocess as sp
 import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 py2 = str is bytes
 
@@ -34,6 +36,8 @@ else:
     import PySimpleGUI as sg
 
 sep_line = "".ljust(80, "-")
+upx_extensions = frozenset((".exe", ".dll", ".pyd"))  # we only handle these
+upx_skip_dlls = ("python", "vcruntime", "msvcp", "cldapi", "edp")  # keep these
 
 
 def mini_skim(bin_dir, val):
@@ -88,6 +92,58 @@ def mini_skim(bin_dir, val):
     print(sep_line)
 
 
+def cpu_count():
+    """Number of CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))  # respects affinity / cgroups
+    except AttributeError:  # not available on Windows
+        return os.cpu_count() or 1
+
+
+def scan_binaries(bin_dir):
+    """
+    Find the binaries to compress in a folder and its sub-folders.
+    Sizes come from the directory entries, which on Windows needs no extra stat.
+    Returns (list of UPX candidates, array of their sizes, size of all other
+    files, number of files).
+    """
+    upx_files = []
+    upx_sizes = array.array("Q")  # compact, summed in C
+    other_size = 0
+    file_count = 0
+    stack = [bin_dir]  # folders still to scan
+    while stack:
+        root = stack.pop()
+        skip_root = "qt-plugins" in root.lower()
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():  # like os.walk
+                        stack.append(entry.path)
+                    continue
+                file_count += 1
+                size = entry.stat().st_size
+                f = entry.name.lower()
+                ext = f[-4:]
+                if (
+                    skip_root
+                    or ext not in upx_extensions  # we only handle these
+                    or (ext == ".dll" and f.startswith(upx_skip_dlls))
+                ):
+                    other_size += size
+                else:
+                    upx_files.append(entry.path)
+                    upx_sizes.append(size)
+    return upx_files, upx_sizes, other_size, file_count
+
+
+def run_upx(fname):
+    """Compress one binary with UPX, discarding its output. Return new size."""
+    cmd = ("upx", "-9", fname)
+    sp.run(cmd, stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+    return os.path.getsize(fname)
+
+
 def upx_compress(bin_dir):
     print("UPX Compression of binaries in folder '%s'" % bin_dir)
     try:
@@ -98,55 +154,24 @@ def upx_compress(bin_dir):
         print(sep_line)
     except:
         return False
-    tasks = []
-    file_count = 0
-    file_sizes = {}
     t0 = time.time()
-    for root, _, files in os.walk(bin_dir):
-        root = root.lower()
-        for f in files:
-            f = f.lower()
-            fname = os.path.join(root, f)
-            file_sizes[fname] = os.stat(fname).st_size
-            if "qt-plugins" in root:
-                continue
-            if not f.endswith((".exe", ".dll", "pyd")):  # we only handle these
-                continue
-            if f.endswith(".dll"):
-                if f.startswith("python"):
-                    continue
-                if f.startswith("vcruntime"):
-                    continue
-                if f.startswith("msvcp"):
-                    continue
-                if f.startswith("cldapi"):
-                    continue
-                if f.startswith("edp"):
-                    continue
-
-            # make the upx invocation command
-            cmd = ("upx", "-9", fname)
-            t = sp.Popen(cmd, stdout=sp.PIPE, stderr=sp.PIPE, shell=False)
-            tasks.append(t)
-            file_count += 1
+    upx_files, upx_sizes, other_size, file_count = scan_binaries(bin_dir)
 
     print(
-        "Started %i compressions out of %i total files ..."
-        % (file_count, len(file_sizes.keys())),
+        "Starting %i compressions out of %i total files ..."
+        % (len(upx_files), file_count),
         flush=True,
     )
 
-    for t in tasks:
-        t.wait()
+    # UPX is CPU bound: run at most one process per usable CPU
+    with ThreadPoolExecutor(max_workers=cpu_count()) as pool:
+        new_sizes = array.array("Q", pool.map(run_upx, upx_files))
 
     t1 = int(round(time.time() - t0))
     print("Finished in %i seconds." % t1, flush=True)
-    old_size = new_size = 0.0
-    for f in file_sizes.keys():
-        old_size += file_sizes[f]
-        new_size += os.stat(f).st_size
-    old_size *= 1.0 / 1024 / 1024
-    new_size *= 1.0 / 1024 / 1024
+    # byte totals are summed as integers, then converted to MB once
+    old_size = (other_size + sum(upx_sizes)) / (1024 * 1024)
+    new_size = (other_size + sum(new_sizes)) / (1024 * 1024)
     diff_size = old_size - new_size
     diff_percent = diff_size / old_size
     text = "\nFolder Compression Results (MB)\nbefore: {:.5}\nafter: {:.5}\nsavings: {:.5} ({:2.1%})"
@@ -274,7 +299,7 @@ pscript_n, ext = os.path.splitext(pscript)
 pscript_dist = pscript_n + ".dist"
 pscript_build = pscript_n + ".build"
 
-cmd = ["python", "-m", "nuitka", "--standalone", "--python-flag=nosite"]
+cmd = [sys.executable, "-m", "nuitka", "--standalone", "--python-flag=nosite"]
 
 if not val["use-console"] or ext.lower() == ".pyw":
     cmd.append("--windows-disable-console")
@@ -289,7 +314,7 @@ if val["remove-build"]:
     cmd.append("--remove-output")
 
 if icon_file:
-    cmd.append('--windows-icon="%s"' % icon_file)
+    cmd.append("--windows-icon=%s" % icon_file)
 
 if compile_to:
     compile_to = os.path.abspath(compile_to)
@@ -298,7 +323,7 @@ else:
 
 pscript_dist = os.path.join(compile_to, os.path.basename(pscript_dist))
 pscript_build = os.path.join(compile_to, os.path.basename(pscript_build))
-output = '--output-dir="%s"' % compile_to
+output = "--output-dir=%s" % compile_to
 cmd.append(output)
 
 if val["qt-support"]:
@@ -316,35 +341,18 @@ if val["np-support"]:
 else:
     cmd.append("--recurse-not-to=numpy")
 
-if val["follow"]:
-    tab = val["follow"].split(",")
-    for t in tab:
-        if t:
-            cmd.append("--recurse-to=" + t.strip())
-
-if val["no-follow"]:
-    tab = val["no-follow"].split(",")
-    for t in tab:
-        if t:
-            cmd.append("--recurse-not-to=" + t.strip())
-
-if val["packages"]:
-    tab = val["packages"].split(",")
-    for t in tab:
-        if t:
-            cmd.append("--include-package=" + t.strip())
-
-if val["modules"]:
-    tab = val["modules"].split(",")
-    for t in tab:
-        if t:
-            cmd.append("--include-module=" + t.strip())
-
-if val["plugin-dir"]:
-    tab = val["plugin-dir"].split(",")
-    for t in tab:
-        if t:
-            cmd.append("--include-plugin-directory=" + t.strip())
+# comma-separated input fields, each item becoming one Nuitka option
+list_options = (
+    ("follow", "--recurse-to="),
+    ("no-follow", "--recurse-not-to="),
+    ("packages", "--include-package="),
+    ("modules", "--include-module="),
+    ("plugin-dir", "--include-plugin-directory="),
+)
+for key, option in list_options:
+    if val[key]:
+        tab = (t.strip() for t in val[key].split(","))
+        cmd.extend(option + t for t in tab if t)  # skip empty items
 
 cmd.append("--experimental=use_pefile")
 
@@ -352,23 +360,24 @@ if val["int-depend"]:
     cmd.append("--experimental=use_pefile_recurse")
     cmd.append("--experimental=use_pefile_fullrecurse")
 
+# Additional arguments are passed on exactly as typed: splitting them with
+# POSIX rules would eat the backslashes of Windows paths.
+cmd_line = sp.list2cmdline(cmd)
 if val["add-args"]:
-    cmd.append(val["add-args"])
-
-cmd.append('"' + pscript + '"')
-cmd = " ".join(cmd)
+    cmd_line += " " + val["add-args"]
+cmd_line += " " + sp.list2cmdline([pscript])
 
 print(sep_line)
 message = [
     "Now executing Nuitka as follows. Please be patient and let it finish!\n",
-    cmd,
+    cmd_line,
 ]
 print("\n".join(message))
 print(sep_line)
 
 compile_start = time.time()  # start stop watch for the compile
 
-rc = sp.Popen(cmd, shell=True)
+rc = sp.Popen(cmd_line)  # Windows takes the command line as is, no shell
 
 sg.Popup(
     message[0],
@@ -16,11 +16,46 @@
 #     limitations under the License.
 #
 
-import sys, os, subprocess, shutil
+import sys, os, subprocess, shutil, mmap
+import concurrent.futures
 import PySimpleGUI as sg
 
 sep_line = "".ljust(80, "-")
 
+
+def scan_files(folder, rel_dir=""):
+    """Yield (relative folder, file DirEntries) for every folder below a folder."""
+    files = []
+    sub_dirs = []
+    with os.scandir(folder) as entries:  # file type comes with the entry
+        for e in entries:
+            if e.is_dir(follow_symlinks=False):
+                sub_dirs.append(e)
+            elif e.is_file():               # not linked folders, like os.walk
+                files.append(e)
+    yield rel_dir, files
+    for e in sub_dirs:
+        yield from scan_files(e.path, rel_dir + os.sep + e.name)
+
+
+def same_content(fn1, fn2, size):
+    """Compare two files of equal size, stopping at the first difference."""
+    if size == 0:  # empty files cannot be mapped
+        return True
+    chunk = 1 << 20
+    with open(fn1, "rb") as f1, open(fn2, "rb") as f2:
+        m1 = mmap.mmap(f1.fileno(), 0, access=mmap.ACCESS_READ)
+        m2 = mmap.mmap(f2.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for pos in range(0, size, chunk):
+                if m1[pos : pos + chunk] != m2[pos : pos + chunk]:
+                    return False
+        finally:
+            m1.close()
+            m2.close()
+    return True
+
+
 form = sg.FlexForm('Merge Binary Folders')
 
 layout = [
@@ -71,21 +106,35 @@ print(sep_line)
 
 copy_this = []                              # collect to-be-merged files here
 
+# sizes of all files already in the output folder, by relative path
+# (normcase: lookups must be case-insensitive on Windows)
+existing = {}
+for rel_dir, files in scan_files(o_dir):
+    key_root = os.path.normcase(rel_dir)
+    for e in files:
+        existing[os.path.join(key_root, os.path.normcase(e.name))] = e.stat().st_size
+
 # collect new files and check binary compatibility of existing ones
-for root, _, files in os.walk(i_dir):
-    for f in files:
-        item = [root.replace(i_dir, ""), f]
+for rel_dir, files in scan_files(i_dir):
+    key_root = os.path.normcase(rel_dir)    # once per folder
+    bin_root = o_dir + rel_dir
+    for e in files:
+        f = e.name
+        item = [rel_dir, f]
         if f.endswith(".exe"):              # always merge (re)compiled EXE
             copy_this.append(item)
             continue
-        bin_fn = os.path.join(o_dir + root.replace(i_dir, ""), f)
-        if not os.path.exists(bin_fn):      # always merge any *new* binary
+        bin_size = existing.get(os.path.join(key_root, os.path.normcase(f)))
+        if bin_size is None:                # always merge any *new* binary
             copy_this.append(item)
             continue
+        bin_fn = os.path.join(bin_root, f)
         # duplicate files must be identical on bit level
-        x = open(os.path.join(root, f), "rb").read()
-        y = open(bin_fn, "rb").read()
-        if x != y:
+        if e.stat().st_size != bin_size:
+            identical = False               # no need to read them
+        else:
+            identical = same_content(e.path, bin_fn, bin_size)
+        if not identical:
             if val["force"] == False:
                 print("Cannot merge: incompatible binary file")
                 print(bin_fn)
@@ -100,11 +149,14 @@ for root, _, files in os.walk(i_dir):
 
 
 # we are good, now copy new stuff
-for f in copy_this:
+def copy_one(f):
     f1 = i_dir + f[0]
     f1 = os.path.join(f1, f[1])
     f2 = o_dir + f[0]
-    if not os.path.exists(f2):
-        os.makedirs(f2)
+    os.makedirs(f2, exist_ok=True)          # other threads may create it too
     print("\nCopying '%s' to:\n'%s'" % (f1, f2))
     shutil.copy2(f1, f2)
+
+
+with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+    list(executor.map(copy_one, copy_this))
@@ -251,24 +251,16 @@ def call_analyzer(f, call_list, import_calls, import_files, trace_logic):
             write_mod(RESULT + "." + item, normalized_file)
         return
 
-    if (
-            CALLED.startswith(RESULT)
-            or RESULT.startswith(CALLED)
-            or RESULT.endswith(CALLED)
-    ):
+    # prefix / suffix tests are needed twice below, so do them once
+    result_has_called = RESULT.startswith(CALLED) or RESULT.endswith(CALLED)
+    if CALLED.startswith(RESULT) or result_has_called:
         # CALL and RESULT names contain each other in some way
         if not implist:
             if CALLED != RESULT:
                 write_mod(CALLED, normalized_file)
             return
-        if CALLED == RESULT:
-            cmod = CALLED
-        elif RESULT.endswith(CALLED):
-            cmod = RESULT
-        elif RESULT.startswith(CALLED):
-            cmod = RESULT
-        else:
-            cmod = CALLED
+        # (for CALLED == RESULT either choice is the same name)
+        cmod = RESULT if result_has_called else CALLED
         for item in implist:  # this is a list of items
             write_mod(cmod + "." + item, normalized_file)
         return
@@ -308,9 +300,9 @@ def clean_json(netto_calls):
         list_out.append(x)  # else keep it
         if x.endswith(".*"):  # another *-import?
             last_item = x[:-1]  # refresh pattern
-    temp_list = [x for x in list_out if x + ".*" in list_out]
-    for x in temp_list:
-        list_out.remove(x)
+    # step 2: remove items that also occur as a *-import
+    seen = set(list_out)
+    list_out = [x for x in list_out if x + ".*" not in seen]
     print("Call cleaning has removed %i items." % (len(netto_calls) - len(list_out)))
     return list_out
 
@@ -336,7 +328,7 @@ def myexit(lname, jname, trace_logic):
     ifile.close()
 
     # make a list of all files that were referenced by an import
-    netto_files = sorted(list(set(import_files)))
+    netto_files = sorted(set(import_files))
 
     # remove unnecessary reference to main module
     hinter_name, _ = os.path.splitext(os.path.basename(lname))
@@ -345,8 +337,7 @@ def myexit(lname, jname, trace_logic):
         netto_files.remove(hinter_name)
 
     # make a list of all items that were referenced by an import
-    netto_calls = [x[0] for x in import_calls if x[1] != hinter_name]
-    netto_calls = sorted(list(set(netto_calls)))
+    netto_calls = sorted({x[0] for x in import_calls if x[1] != hinter_name})
 
     # remove items which do not increase the compiled material
     cleaned_list = clean_json(netto_calls)
@@ -29,73 +29,78 @@ this plugin, whether to include it.
 """
 import os
 import sys
-import json
+
+try:  # prefer the faster parsers if they are installed
+    import orjson as json_parser
+except ImportError:
+    try:
+        import ujson as json_parser
+    except ImportError:
+        import json as json_parser
 
 from nuitka import Options
-from nuitka.containers.oset import OrderedSet
 from nuitka.containers.odict import OrderedDict
 from nuitka.plugins.PluginBase import NuitkaPluginBase
 from nuitka.plugins.Plugins import lateActivatePlugin, getActivePlugins
-from nuitka.utils.FileOperations import getFileContents
 from nuitka.utils.Timing import StopWatch
 from nuitka.utils.Utils import getOS
 from nuitka.Version import getNuitkaVersion
 
 
 def remove_suffix(mod_dir, mod_name):
-    if mod_name not in mod_dir:
+    p = mod_dir.find(mod_name)  # a single scan also tells if it is present
+    if p < 0:
         return mod_dir
-    l = len(mod_name)
-    p = mod_dir.find(mod_name) + l
-    return mod_dir[:p]
+    return mod_dir[: p + len(mod_name)]
 
 
-def check_dependents(full_name, import_list):
-    """ Check if we are parent of a loaded / recursed-to module file.
+def get_parent_packages(import_list):
+    """ Collect the packages which are parents of loaded / recursed-to modules.
 
     Notes:
-        Accept full_name if full_name.something is a recursed-to module
+        Eg. for "a.b.c" the names "a" and "a.b" are collected. Nuitka must
+        accept full_name if full_name.something is a recursed-to module.
 
     Args:
-        full_name: The full module name
         import_list: List of recursed-to modules
     Returns:
-        Bool
+        Set of package names
     """
-    search_name = full_name + "."
+    parents = set()
     for item in import_list:
-        if item.startswith(search_name):
-            return True
-    return False
+        name = item.rpartition(".")[0]
+        while name and name not in parents:  # parents of known names are in
+            parents.add(sys.intern(name))
+            name = name.rpartition(".")[0]
+    return parents
 
 
-def get_checklist(full_name):
-    """ Generate a list of names that may contain the 'full_name'.
+def is_hinted(full_name, import_calls, hinted_packages):
+    """ Check whether 'full_name' is covered by the hinted called items.
 
     Notes:
-        Eg. if full_name looks like "a.b.c", then the list
-
-        ["a.b.c", "a.*", "a.b.*", "a.b.c.*"]
-
-        is generated. So either the full name itself may be found, or when
-        full_name is included in some *-import.
+        Eg. if full_name looks like "a.b.c", then it is looked up in the
+        called items, and "a.b.c", "a.b", "a" are looked up in the packages
+        hinted via a *-import, stopping at the first hit. So either the full
+        name itself may be found, or when full_name is included in some
+        *-import.
     Args:
-        full_name: The full module name
+        full_name: The full module name (string)
+        import_calls: Set of called items
+        hinted_packages: Set of packages that have a *-import
     Returns:
-        List of possible "containers".
+        Bool
     """
     if not full_name:  # guard against nonsense
-        return []
-    checklist = [full_name.asString(), full_name.asString() + '.*']  # full name is always looked up first
-    m0 = ""
-    while True:     # generate *-import names
-        pkg, full_name = full_name.splitPackageName()
-        if not pkg:
-            break
-        m = pkg.asString()
-        m0 += "." + m if m0 else m
-        checklist.append(m0 + ".*")
-    return tuple(checklist)  # tuples are a bit more efficient
+        return False
+    if full_name in import_calls:  # full name is always looked up first
+        return True
+    name = full_name
+    while name:  # walk up the package names
+        if name in hinted_packages:
+            return True
+        name = name.rpartition(".")[0]
+    return False
 
 
 def drop_msg(module_name, module_package):
@@ -108,11 +113,87 @@ def drop_msg(module_name, module_package):
     return ignore_msg
 
 
+# testing components, which are suppressed unless accept_test is set
+test_packages = ("pytest", "_pytest", "unittest")
+
+# all of these are dropped if no matplotlib backend is used
+matplotlib_packages = ("matplotlib", "mpl_toolkits")
+
+# Called items which require a standard plugin, mapped to an indicator name.
+# Items where only a name prefix is known are listed in plugin_prefixes.
+plugin_triggers = {
+    "numpy": "np",
+    "numpy.*": "np",
+    "matplotlib": "mpl",
+    "matplotlib.*": "mpl",
+    "tkinter": "tk",
+    "Tkinter": "tk",
+    "tkinter.*": "tk",
+    "Tkinter.*": "tk",
+    "scipy": "scipy",
+    "scipy.*": "scipy",
+    "multiprocessing": "mp",
+    "multiprocessing.*": "mp",
+    "Pmw": "pmw",
+    "Pmw.*": "pmw",
+    "torch": "torch",
+    "sklearn": "sklearn",
+    "sklearn.*": "sklearn",
+    "tensorflow": "tflow",
+    "tensorflow.*": "tflow",
+    "gevent": "gevent",
+    "gevent.*": "gevent",
+    "eventlet": "eventlet",
+    "eventlet.*": "eventlet",
+    "dill": "dill",
+    "dill.*": "dill",
+    # "trio": "trio",
+    # "trio.*": "trio",
+}
+plugin_prefixes = (("PyQt", "qt"), ("PySide", "qt"))
+all_plugin_flags = frozenset(plugin_triggers.values()).union(
+    flag for _, flag in plugin_prefixes
+)
+
+# Standard plugins to enable for an indicator, in order of activation.
+standard_plugins = (
+    ("np", "numpy"),
+    ("tk", "tk-inter"),
+    ("qt", "qt-plugins"),  # TODO more scrutiny for the qt options!
+    ("mp", "multiprocessing"),
+    ("pmw", "pmw-freezer"),
+    ("torch", "torch"),
+    ("tflow", "tensorflow"),
+    ("gevent", "gevent"),
+    ("eventlet", "eventlet"),
+    ("dill", "dill-compat"),
+    # ("trio", "trio"),
+)
+
+
 class HintedModsPlugin(NuitkaPluginBase):
 
     # Derive from filename, but can and should also be explicit.
     plugin_name = __name__.split(".")[-1]
 
+    # fixed instance attributes for faster access in onModuleEncounter
+    __slots__ = (
+        "timer",
+        "decisions",
+        "package_imports",
+        "implicit_imports",
+        "import_calls",
+        "import_files",
+        "import_calls_set",
+        "hinted_packages",
+        "parent_packages",
+        "msg_count",
+        "msg_limit",
+        "accept_test",
+        "implicit_imports_plugin",
+        "other_plugins",
+    )
+
     def __init__(self, hinted_json_file):
         """ Read the JSON file and enable any standard plugins.
 
@@ -128,19 +209,22 @@ class HintedModsPlugin(NuitkaPluginBase):
         self.timer = StopWatch()
         self.timer.start()
 
-        self.implicit_imports = OrderedSet()  # speed up repeated lookups
-        self.ignored_modules = OrderedSet()  # speed up repeated lookups
+        self.decisions = {}  # interned name -> verdict, for repeated encounters
+        self.package_imports = {}  # implicit import names per package
+        self.implicit_imports = set()  # all known implicit import names
         options = Options.options
 
         # Load json file contents from --hinted-json-file= argument
         filename = hinted_json_file
         try:
             # read it and extract the two lists
-            import_info = json.loads(getFileContents(filename))
+            with open(filename, "rb") as fin:
+                import_info = json_parser.loads(fin.read())
         except (ValueError, FileNotFoundError):
             raise FileNotFoundError('Cannot load json file %s' % filename)
         self.import_calls = import_info["calls"]
         self.import_files = import_info["files"]
+        del import_info  # only the two lists are needed from here on
         self.msg_count = dict()  # to limit keep messages
         self.msg_limit = 21
 
@@ -153,127 +237,76 @@ class HintedModsPlugin(NuitkaPluginBase):
         Check if we should enable any (optional) standard plugins. This code
         must be modified whenever more standard plugin become available.
         """
-        show_msg = False  # only show info if one ore more detected
-        # indicators for found packages
-        tk = np = qt = scipy = mp = pmw = torch = sklearn = False
-        eventlet = tflow = gevent = mpl = trio = dill = False
         msg = "'%s' is adding the following options:" % os.path.basename(
             self.plugin_name
         )
 
         # we need matplotlib-specific cleanup to happen first:
         # if no mpl backend is used, reference to matplotlib is removed alltogether
-        if "matplotlib.backends" not in self.import_files:
-            temp = [
-                f
-                for f in self.import_calls
-                if not f.startswith(("matplotlib", "mpl_toolkits"))
-            ]
-            self.import_calls = temp
-            temp = [
-                f
-                for f in self.import_files
-                if not f.startswith(("matplotlib", "mpl_toolkits"))
-            ]
-            self.import_files = temp
-
-        # detect required standard plugins and request enabling them
+        drop_mpl = "matplotlib.backends" not in self.import_files
+
+        # one pass over the called items: apply the matplotlib cleanup, make
+        # hashed copies for fast lookups and detect required standard plugins
+        calls = []
+        hinted_packages = set()  # the "x" of every "x.*" item
+        flags = set()  # indicators for found packages
         for m in self.import_calls:  # scan thru called items
-            if m in ("numpy", "numpy.*"):
-                np = True
-                show_msg = True
-            if m in ("matplotlib", "matplotlib.*"):
-                mpl = True
-                show_msg = True
-            elif m in ("tkinter", "Tkinter", "tkinter.*", "Tkinter.*"):
-                tk = True
-                show_msg = True
-            elif m.startswith(("PyQt", "PySide")):
-                qt = True
-                show_msg = True
-            elif m in ("scipy", "scipy.*"):
-                scipy = True
-                show_msg = True
-            elif m in ("multiprocessing", "multiprocessing.*") and getOS() == "Windows":
-                mp = True
-                show_msg = True
-            elif m in ("Pmw", "Pmw.*"):
-                pmw = True
-                show_msg = True
-            elif m == "torch":
-                torch = True
-                show_msg = True
-            elif m in ("sklearn", "sklearn.*"):
-                sklearn = True
-                show_msg = True
-            elif m in ("tensorflow", "tensorflow.*"):
-                tflow = True
-                show_msg = True
-            elif m in ("gevent", "gevent.*"):
-                gevent = True
-                show_msg = True
-            elif m in ("eventlet", "eventlet.*"):
-                eventlet = True
-                show_msg = True
-            elif m in ("dill", "dill.*"):
-                dill = True
-                show_msg = True
-            # elif m in ("trio", "trio.*"):
-            #    trio = True
-            #    show_msg = True
+            if drop_mpl and m.startswith(matplotlib_packages):
+                continue
+            m = sys.intern(m)
+            calls.append(m)
+            if m.endswith(".*"):
+                hinted_packages.add(sys.intern(m[:-2]))
 
+            if len(flags) == len(all_plugin_flags):  # nothing left to detect
+                continue
+            flag = plugin_triggers.get(m)
+            if flag is None:
+                for prefix, prefix_flag in plugin_prefixes:
+                    if m.startswith(prefix):
+                        flag = prefix_flag
+                        break
+                else:
+                    continue
+            flags.add(flag)
+
+        self.import_calls = tuple(calls)
+        self.import_calls_set = frozenset(calls)
+        self.hinted_packages = frozenset(hinted_packages)
+
+        if getOS() != "Windows":  # multiprocessing needs no plugin elsewhere
+            flags.discard("mp")
+
+        show_msg = bool(flags)  # only show info if one ore more detected
         if show_msg is True:
             self.info(msg)
 
         to_enable = OrderedDict()
+        for flag, plugin_name in standard_plugins:
+            if flag in flags:
+                to_enable[plugin_name] = {}
 
-        if np:
+        if "numpy" in to_enable:
             to_enable["numpy"] = {
-                "include_matplotlib": mpl,
-                "include_scipy": scipy,
+                "include_matplotlib": "mpl" in flags,
+                "include_scipy": "scipy" in flags,
                 # TODO: Numpy plugin didn't use this, work in progress or not needed?
                 # "sklearn" : sklearn
             }
 
-        if tk:
-            to_enable["tk-inter"] = {}
-
-        if qt:
-            # TODO more scrutiny for the qt options!
-            to_enable["qt-plugins"] = {}
-
-        if mp:
-            to_enable["multiprocessing"] = {}
-
-        if pmw:
-            to_enable["pmw-freezer"] = {}            
-
-        if torch:
-            to_enable["torch"] = {}            
-
-        if tflow:
-            to_enable["tensorflow"] = {}            
-
-        if gevent:
-            to_enable["gevent"] = {}                        
-
-        if eventlet:
-            to_enable["eventlet"] = {}                                    
-
-        if dill:
-            to_enable["dill-compat"] = {}                                                
-
-        # if trio:
-        #    to_enable["trio"] = {}
-
-        recurse_count = 0
-        for f in self.import_files:  # request recursion to called modules
-            if self.accept_test is False and f.startswith(
-                ("pytest", "_pytest", "unittest")
-            ):
+        files = []
+        accepted = []  # modules we request recursion to
+        for f in self.import_files:
+            if drop_mpl and f.startswith(matplotlib_packages):
+                continue
+            files.append(f)
+            if self.accept_test is False and f.startswith(test_packages):
                 continue
-            options.recurse_modules.append(f)
-            recurse_count += 1
+            accepted.append(f)
+        options.recurse_modules.extend(accepted)
+        recurse_count = len(accepted)
+        self.import_files = tuple(files)
+        self.parent_packages = frozenset(get_parent_packages(files))
 
         # no plugin detected, but recursing to modules?
         if not show_msg and recurse_count > 0:
@@ -293,6 +326,7 @@ class HintedModsPlugin(NuitkaPluginBase):
             self.info(msg)
 
         self.implicit_imports_plugin = None  # the 'implicit-imports' plugin object
+        self.other_plugins = None  # active plugins except this one
 
     @classmethod
     def addPluginCommandLineOptions(cls, group):
@@ -310,10 +344,10 @@ class HintedModsPlugin(NuitkaPluginBase):
 
         Notes:
             Performance considerations: the calls array is rather long
-            (may be thousands of items). So we store ignored modules
-            separately and check that array first.
-            We also maintain an array for known implicit imports and early
-            check against them, too.
+            (may be thousands of items), and modules are encountered
+            repeatedly. So every verdict is stored per module name and
+            returned directly the next time - a kept module only once its
+            top level package is known not to be dropped.
 
         Args:
             module_filename: path of the module
@@ -324,102 +358,129 @@ class HintedModsPlugin(NuitkaPluginBase):
             None, (True, 'text') or (False, 'text').
             Example: (False, "because it is not called").
         """
+        # local names for attributes used repeatedly below
+        decisions = self.decisions
+        my_name = self.plugin_name
+
         full_name = module_name
-        top_level_package_name = full_name.getTopLevelPackageName()
-        package = module_name.getPackageName()
-        package_dir = remove_suffix(module_filename, top_level_package_name)
+        name_str = sys.intern(full_name.asString())  # fast dict lookups
+        rc = decisions.get(name_str)
+        if rc is not None and rc[0] is False:  # dropped before
+            return rc
+
+        # plain string equivalent of full_name.getTopLevelPackageName()
+        top_level_package_name = name_str.partition(".")[0]
 
-        # fall through for easy cases
+        # fall through for easy cases, cheapest checks first
         if top_level_package_name == "pkg_resources":
             return None
 
-        if (
-            full_name in self.ignored_modules or top_level_package_name in self.ignored_modules
-        ):  # known to be ignored
+        top_rc = decisions.get(top_level_package_name)
+        if top_rc is not None and top_rc[0] is False:  # whole package is ignored
             return False, "module is not used"
 
-        if self.accept_test is False and top_level_package_name in (
-            "pytest",
-            "_pytest",
-            "unittest",
-        ):
+        if rc is not None:  # kept before
+            return rc
+
+        if name_str == "cv2":
+            return True, "needed by OpenCV"
+
+        package = module_name.getPackageName()
+
+        if self.accept_test is False and top_level_package_name in test_packages:
             self.info(drop_msg(full_name, package))
-            self.ignored_modules.add(full_name)
-            return False, "suppress testing components"
+            rc = decisions[name_str] = (False, "suppress testing components")
+            return rc
 
-        if full_name in self.implicit_imports:  # known implicit import
+        if name_str in self.implicit_imports:  # known implicit import
             return True, "module is an implicit import"  # ok
 
         # check if other plugins would accept this
-        for plugin in getActivePlugins():
-            if plugin.plugin_name == self.plugin_name:
-                continue  # skip myself of course
+        if self.other_plugins is None:  # all plugins are active by now
+            self.other_plugins = tuple(
+                p for p in getActivePlugins() if p.plugin_name != my_name
+            )
+            for plugin in self.other_plugins:  # needed further down
+                if plugin.plugin_name == "implicit-imports":
+                    self.implicit_imports_plugin = plugin
+                    break
+            else:
+                sys.exit("could not find 'implicit-imports' plugin")
+        for plugin in self.other_plugins:
             rc = plugin.onModuleEncounter(module_filename, module_name, module_kind)
             if rc is not None:
                 if rc[0] is True:  # plugin wants to keep this
-                    self.implicit_imports.add(full_name)
-                    keep_msg = "keep %s (plugin '%s')" % (full_name, plugin.plugin_name)
+                    rc = decisions[name_str] = (True, "module is imported")
+                    # format the message only if it is being shown
                     count = self.msg_count.get(plugin.plugin_name, 0)
                     if count < self.msg_limit:
-                        self.info(keep_msg)
-                    self.msg_count[plugin.plugin_name] = count + 1
-                    if count == self.msg_limit:
+                        self.info(
+                            "keep %s (plugin '%s')"
+                            % (full_name, plugin.plugin_name)
+                        )
+                    elif count == self.msg_limit:
                         self.info(
                             "... 'keep' msg limit exceeded for '%s'."
                             % plugin.plugin_name
                         )
-                    return True, "module is imported"  # ok
+                    else:  # counter is no longer needed
+                        return rc
+                    self.msg_count[plugin.plugin_name] = count + 1
+                    return rc  # ok
                 # plugin wants to drop this
-                self.ignored_modules.add(full_name)
-                ignore_msg = "drop %s (plugin '%s')" % (full_name, plugin.plugin_name)
+                ignore_msg = "drop %s (plugin '%s')" % (
+                    full_name,
+                    plugin.plugin_name,
+                )
                 self.info(ignore_msg)
-                return False, "dropped by plugin " + plugin.plugin_name
-
-        if full_name.asString() == "cv2":
-            return True, "needed by OpenCV"
-
-        if str(full_name.getTopLevelPackageName()).startswith("pywin"):
-            return True, "needed by pywin32"
+                rc = decisions[name_str] = (
+                    False,
+                    "dropped by plugin " + plugin.plugin_name,
+                )
+                return rc
 
-        checklist = get_checklist(full_name)
-        for m in self.import_calls:  # loop thru the called items
-            if m in checklist:
-                return True, "module is hinted to"  # ok
+        if top_level_package_name.startswith("pywin"):
+            rc = decisions[name_str] = (True, "needed by pywin32")
+            return rc
 
-        if check_dependents(full_name.asString(), self.import_files) is True:
-            return True, "parent of recursed-to module"
+        if is_hinted(name_str, self.import_calls_set, self.hinted_packages):
+            rc = decisions[name_str] = (True, "module is hinted to")
+            return rc  # ok
 
-        # next we ask if implicit imports knows our candidate
-        if self.implicit_imports_plugin is None:  # the plugin is not yet loaded
-            for plugin in getActivePlugins():
-                if plugin.plugin_name == "implicit-imports":
-                    self.implicit_imports_plugin = plugin
-                    break
-            if self.implicit_imports_plugin is None:
-                sys.exit("could not find 'implicit-imports' plugin")
+        if name_str in self.parent_packages:
+            rc = decisions[name_str] = (True, "parent of recursed-to module")
+            return rc
 
-        # ask the 'implicit-imports' plugin whether it knows this guy
+        # next we ask the 'implicit-imports' plugin whether it knows this guy
         if package is not None:
-            try:
-                import_set = self.implicit_imports_plugin.getImportsByFullname(
-                    package, package_dir
-                )
-            except TypeError:
-                sys.exit(
-                    "versions of hinted-mods.py and ImplicitImports.py are incompatible"
+            package_dir = remove_suffix(module_filename, top_level_package_name)
+            package_key = (package, package_dir)
+            import_names = self.package_imports.get(package_key)
+            if import_names is None:  # first time for this package
+                try:
+                    import_set = self.implicit_imports_plugin.getImportsByFullname(
+                        package, package_dir
+                    )
+                except TypeError:
+                    sys.exit(
+                        "versions of hinted-mods.py and ImplicitImports.py are incompatible"
+                    )
+                # only the names
+                import_names = frozenset(
+                    sys.intern(str(item[0])) for item in import_set
                 )
+                self.package_imports[package_key] = import_names
 
-            import_list0 = [item[0] for item in import_set]  # only the names
-            if full_name in import_list0:  # found!
-                for item in import_list0:  # store everything in that list
-                    self.implicit_imports.add(item)
-                return True, "module is an implicit import"  # ok
+            if name_str in import_names:  # found!
+                self.implicit_imports.update(import_names)  # checked further up
+                rc = decisions[name_str] = (True, "module is an implicit import")
+                return rc  # ok
 
         # not known by anyone: kick it out!
         self.info(drop_msg(full_name, package))  # issue ignore message
         # faster decision next time
-        self.ignored_modules.add(full_name)
-        return False, "module is not used"
+        rc = decisions[name_str] = (False, "module is not used")
+        return rc
 
     def getImplicitImports(self, module):
         """Declare all matplotlib.backends modules as implicit imports."""
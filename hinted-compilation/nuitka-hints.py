@@ -31,8 +31,6 @@ modules in the distribution folder.
 """
 import sys
 import os
-import json
-import platform
 from nuitka.__main__ import main
 from nuitka.Version import getNuitkaVersion
 
@@ -88,13 +86,8 @@ user_plugin_opt = "--hinted-json-file=%s" % json_fname
 my_opts.append(user_plugin)
 my_opts.append(user_plugin_opt)
 
-# now build a new sys.argv array
-new_sysargs = [sys.argv[0]]
-for o in my_opts:
-    new_sysargs.append(o)
-
-new_sysargs.extend(sys.argv[1:])
-sys.argv = new_sysargs
+# now put our options into sys.argv
+sys.argv[1:1] = my_opts  # insert our options in front
 
 # keep user happy with some type of protocol
 print(
@@ -17,10 +17,58 @@
 #
 
 import os, sys
+import concurrent.futures
+import itertools
 import pythoncom
 from win32com.shell import shell, shellcon
 import PySimpleGUI as sg
 
+
+# all spellings of ".exe", so no per-file lowercase copy is needed
+exe_extensions = tuple(
+    "." + "".join(chars) for chars in itertools.product("eE", "xX", "eE")
+)
+
+
+def get_exe_files(folder):
+    """Return the names of the EXE files in a folder."""
+    with os.scandir(folder) as entries:  # file type comes with the entry
+        return [
+            e.name
+            for e in entries
+            if e.name.endswith(exe_extensions) and e.is_file()
+        ]
+
+
+def make_links(exe_files, exe_filedir, tar_folder):
+    """Create links to some EXE files, in a COM apartment of this thread."""
+    pythoncom.CoInitialize()
+    try:
+        # One link instance serves all EXEs: every Set* call below fully
+        # overwrites what was stored for the previous one. Both interfaces
+        # are fetched when creating it.
+        shortcut, persist_file = pythoncom.CoCreateInstanceEx(
+            shell.CLSID_ShellLink,
+            None,
+            pythoncom.CLSCTX_INPROC_SERVER,
+            None,
+            (shell.IID_IShellLink, pythoncom.IID_IPersistFile),
+        )
+        shortcut.SetWorkingDirectory(exe_filedir)  # same for all EXEs
+        for exe_base in exe_files:
+            exe_file = os.path.join(exe_filedir, exe_base)  # full EXE name
+            exe_name, exe_ext = os.path.splitext(exe_base)  # split off extension
+            shortcut.SetPath(exe_file)  # set file path
+            shortcut.SetDescription("Link to %s" % exe_file)  # set description
+            shortcut.SetIconLocation(exe_file, 0)  # set the icon
+            persist_file.Save(
+                os.path.join(tar_folder, "%s.lnk" % exe_name.title()), 0
+            )
+        persist_file = shortcut = None  # release link instance
+    finally:
+        pythoncom.CoUninitialize()
+
+
 desktop_path = shell.SHGetFolderPath(0, shellcon.CSIDL_DESKTOP, 0, 0)
 
 form = sg.FlexForm("Create Links to EXE Files in a Folder")
@@ -40,8 +88,11 @@ layout = [
     [sg.Submit(), sg.Cancel()],
 ]
 
+form.Layout(layout).Finalize()  # build the widgets only once
+pgm_dir = form.FindElement("pgm-dir")
+
 while True:
-    btn, val = form.Layout(layout).Read()
+    btn, val = form.Read()
 
     if btn != "Submit" or not val["pgm-dir"]:
         break
@@ -49,16 +100,15 @@ while True:
     input_dir = exe_filedir = os.path.abspath(val["pgm-dir"])
     if not os.path.exists(exe_filedir):
         message.Update("No such folder: '%s'" % val["pgm-dir"])
+        pgm_dir.Update("")  # clear the stale entry
         continue
 
-    flist = os.listdir(exe_filedir)
-    exe_files = [f for f in flist if f.lower().endswith(".exe")]
+    exe_files = get_exe_files(exe_filedir)
 
     if len(exe_files) == 0:
         exe_filedir = os.path.join(exe_filedir, "bin")
         try:
-            flist = os.listdir(exe_filedir)
-            exe_files = [f for f in flist if f.lower().endswith(".exe")]
+            exe_files = get_exe_files(exe_filedir)
         except:
             pass
 
@@ -75,21 +125,16 @@ while True:
         message.Update("Output folder does not exist: '%s'" % tar_folder)
         continue
 
-    # We are all set. Now create a link for each of the EXE files.
-    for exe_base in exe_files:
-        exe_file = os.path.join(exe_filedir, exe_base)  # full EXE name
-        exe_name, exe_ext = os.path.splitext(exe_base)  # split off extension
-        shortcut = pythoncom.CoCreateInstance(  # create link instance
-            shell.CLSID_ShellLink,
-            None,
-            pythoncom.CLSCTX_INPROC_SERVER,
-            shell.IID_IShellLink,
+    # We are all set. Now create a link for each of the EXE files,
+    # spreading them over a few threads.
+    workers = min(8, len(exe_files))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        list(
+            executor.map(
+                make_links,
+                [exe_files[i::workers] for i in range(workers)],
+                itertools.repeat(exe_filedir),
+                itertools.repeat(tar_folder),
+            )
         )
-        shortcut.SetPath(exe_file)  # set file path
-        shortcut.SetDescription("Link to %s" % exe_file)  # set description
-        shortcut.SetIconLocation(exe_file, 0)  # set the icon
-        shortcut.SetWorkingDirectory(exe_filedir)
-        persist_file = shortcut.QueryInterface(pythoncom.IID_IPersistFile)
-        persist_file.Save(os.path.join(tar_folder, "%s.lnk" % exe_name.title()), 0)
-        shortcut = None
     break
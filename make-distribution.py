@@ -20,6 +20,7 @@
 import os
 import platform
 import subprocess
+import sys
 from logging import info
 from nuitka import Options
 from nuitka.plugins.PluginBase import NuitkaPluginBase
@@ -84,8 +85,7 @@ class MyExit(NuitkaPluginBase):
             raise SystemExit("only 1 post-processor can be chosen")
 
         # announce how we will execute
-        msg = " '%s' established the following configuration" % self.plugin_name
-        info(msg)
+        info(" '%s' established the following configuration", self.plugin_name)
         info(self.sep_line2)
 
         if self.numpy is False:
@@ -121,7 +121,7 @@ class MyExit(NuitkaPluginBase):
         if self.tk is False:
             basename = os.path.basename(dll_filename)
             if basename.startswith(("tk", "tcl")):
-                info(" exluding " + basename)
+                info(" exluding %s", basename)
                 self.excludes.append(basename)
             yield ()
         if "qt" in dll_filename.lower():
@@ -144,7 +144,7 @@ class MyExit(NuitkaPluginBase):
         """
         self.timer.end()
         t = int(round(self.timer.delta()))
-        info(" Compilation ended in %i seconds." % t)
+        info(" Compilation ended in %i seconds.", t)
 
         for f in self.excludes:
             fname = os.path.join(dist_dir, f)
@@ -156,9 +156,9 @@ class MyExit(NuitkaPluginBase):
             info(self.sep_line1)
 
             if "linux" in platform.system():
-                subprocess.call("python onefile-maker-linux.py " + dist_dir)
+                subprocess.run([sys.executable, "onefile-maker-linux.py", dist_dir])
             elif "win32" in platform.system():
-                subprocess.call("python onefile-maker-windows.py " + dist_dir)
+                subprocess.run([sys.executable, "onefile-maker-windows.py", dist_dir])
             else:
                 raise SystemError("Platform not supported")
 
@@ -167,13 +167,13 @@ class MyExit(NuitkaPluginBase):
         if self.onedir:
             info(" Now starting OneDir maker")
             info(self.sep_line1)
-            subprocess.call("python onedir-maker.py " + dist_dir)
+            subprocess.run([sys.executable, "onedir-maker.py", dist_dir])
             return None
 
         if self.upx:
             info(" Now starting UPX packer")
             info(self.sep_line1)
-            subprocess.call("python upx-packer.py " + dist_dir)
+            subprocess.run([sys.executable, "upx-packer.py", dist_dir])
             return None
 
         info(self.sep_line1)
@@ -10,13 +10,7 @@ my_opts = [
     "--disable-dll-dependency-cache",
 ]
 
-new_sysargs = [sys.argv[0]]
-for o in my_opts:
-    new_sysargs.append(o)
-
-new_sysargs.extend(sys.argv[1:])
-
-sys.argv = new_sysargs
+sys.argv[1:1] = my_opts  # insert our options in front
 print("NUITKA is compiling '%s' with these options:" % sys.argv[-1])
 for o in sys.argv[1:-1]:
     print(" " + o)
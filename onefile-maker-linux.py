@@ -45,7 +45,10 @@ Dependencies
 
 """
 import os
+import errno
 import argparse
+import shutil
+import subprocess
 
 parser = argparse.ArgumentParser()
 
@@ -79,8 +82,16 @@ if not os.path.isdir(dist) or not dist.endswith(".dist"):
 
 filename = os.path.basename(dist).split('.')[0] + '-onefile.sh'
 
-command = "./makeself.sh {} {} '{}' ./{}".format(dist,filename,args.label,args.executable)
-move_command = "mv {} {}".format(os.path.join(os.getcwd(), filename), os.path.join(cwd, filename))
-
-os.system(command)
-os.system(move_command)
\ No newline at end of file
+command = ["./makeself.sh", dist, filename, args.label, "./" + args.executable]
+rc = subprocess.run(command).returncode
+if rc != 0:
+    raise SystemExit("makeself.sh failed with return code %i" % rc)
+
+src = os.path.join(os.getcwd(), filename)
+dst = os.path.join(cwd, filename)
+try:
+    os.replace(src, dst)  # a simple rename on the same file system
+except OSError as e:
+    if e.errno != errno.EXDEV:
+        raise
+    shutil.move(src, dst)  # different file systems: copy, then delete
@@ -48,9 +48,11 @@ import sys
 import os
 import time
 import getopt
-from fnmatch import fnmatch
+import re
+from fnmatch import translate
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 _GUI = True
 
@@ -64,67 +66,93 @@ except ModuleNotFoundError:
     _GUI = False
 
 
-def glob_path_match(path, pattern_list):
+def glob_path_matcher(pattern_list):
     """
-    Checks if path is in a list of glob style wildcard paths
-    :param path: path of file / directory
+    Prepares a list of glob style wildcard paths for repeated matching
+    Patterns without wildcards are looked up in a set, all others are combined
+    into one regular expression. Case is handled like fnmatch does.
     :param pattern_list: list of wildcard patterns to check for
-    :return: Boolean
+    :return: function telling if a path matches any of the patterns
     """
-    return any(fnmatch(path, pattern) for pattern in pattern_list)
+    patterns = [os.path.normcase(pattern) for pattern in pattern_list]
+    exact_set = frozenset(p for p in patterns if not any(c in p for c in "*?["))
+    wildcards = [p for p in patterns if p not in exact_set]
+    if wildcards:
+        wildcard_match = re.compile("|".join(map(translate, wildcards))).match
+    else:
+        wildcard_match = None
 
+    def glob_path_match(path):
+        path = os.path.normcase(path)
+        if path in exact_set:
+            return True
+        return wildcard_match is not None and wildcard_match(path) is not None
 
-def get_files_recursive(
-    root,
-    d_exclude_list=None,
-    f_exclude_list=None,
-    ext_exclude_list=None,
-    primary_root=None,
+    return glob_path_match
+
+
+def get_file_entries(
+    root, d_exclude_list=None, f_exclude_list=None, ext_exclude_list=None
 ):
     """
-    Walk a path to recursively find files
-    Modified version of https://stackoverflow.com/a/24771959/2635443 that includes exclusion lists
-    and accepts glob style wildcards on files and directories
+    Walk a path to find files, using os.scandir and a work stack instead of recursion
+    Includes exclusion lists and accepts glob style wildcards on files and directories
     :param root: path to explore
     :param d_exclude_list: list of root relative directories paths to exclude
     :param f_exclude_list: list of filenames without paths to exclude
     :param ext_exclude_list: list of file extensions to exclude, ex: ['.log', '.bak']
-    :param primary_root: Only used for internal recursive exclusion lookup, don't pass an argument here
-    :return: list of files found in path
+    :return: generator of os.DirEntry objects for the files found in path
     """
 
     if d_exclude_list is not None:
-        # Make sure we use a valid os separator for exclusion lists, this is done recursively :(
+        # Make sure we use a valid os separator for exclusion lists
         d_exclude_list = [os.path.normpath(d) for d in d_exclude_list]
     else:
         d_exclude_list = []
     if f_exclude_list is None:
         f_exclude_list = []
-    if ext_exclude_list is None:
-        ext_exclude_list = []
-
-    files = [
-        os.path.join(root, f)
-        for f in os.listdir(root)
-        if os.path.isfile(os.path.join(root, f))
-        and not glob_path_match(f, f_exclude_list)
-        and os.path.splitext(f)[1] not in ext_exclude_list
+    dir_excluded = glob_path_matcher(d_exclude_list)
+    file_excluded = glob_path_matcher(f_exclude_list)
+    ext_exclude_set = frozenset(ext_exclude_list or ())
+    splitext = os.path.splitext  # local name for the loop below
+
+    stack = [(root, None)]  # directories still to scan, with root relative path
+    while stack:
+        directory, rel_directory = stack.pop()
+        dirs = []
+        with os.scandir(directory) as entries:  # file type comes with the entry
+            for entry in entries:
+                if entry.is_file():
+                    name = entry.name
+                    if file_excluded(name):
+                        continue
+                    # split off the extension only if there are any to check
+                    if ext_exclude_set and splitext(name)[1] in ext_exclude_set:
+                        continue
+                    yield entry
+                elif entry.is_dir():
+                    if rel_directory is not None:
+                        p_root = os.path.join(rel_directory, entry.name)
+                    else:
+                        p_root = entry.name
+                    if not dir_excluded(p_root):
+                        dirs.append((entry.path, p_root))
+        stack.extend(reversed(dirs))  # keep the directory order of a recursion
+
+
+def get_files_recursive(
+    root, d_exclude_list=None, f_exclude_list=None, ext_exclude_list=None
+):
+    """
+    Walk a path to recursively find files, see get_file_entries
+    :return: list of files found in path
+    """
+    return [
+        entry.path
+        for entry in get_file_entries(
+            root, d_exclude_list, f_exclude_list, ext_exclude_list
+        )
     ]
-    dirs = [d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d))]
-    for d in dirs:
-        p_root = os.path.join(primary_root, d) if primary_root is not None else d
-        if not glob_path_match(p_root, d_exclude_list):
-            files_in_d = get_files_recursive(
-                os.path.join(root, d),
-                d_exclude_list,
-                f_exclude_list,
-                ext_exclude_list,
-                primary_root=p_root,
-            )
-            if files_in_d:
-                for f in files_in_d:
-                    files.append(os.path.join(root, f))
-    return files
 
 
 def get_lzma_dict_size(directory):
@@ -132,16 +160,23 @@ def get_lzma_dict_size(directory):
 
     # Get dist size (bytes to MB by shr 20)
     # Lets assume that dict should be 2 <= dist_size <= 128 MB
-    total_dist_size = 0
-    for file in get_files_recursive(directory):
-        if not os.path.islink(file):
-            total_dist_size += os.path.getsize(file) >> 20
+    total_bytes = 0  # sum bytes first, so small files are not lost
+    max_file_bytes = 0
+    for entry in get_file_entries(directory):
+        if not entry.is_symlink():
+            size = entry.stat().st_size
+            total_bytes += size
+            max_file_bytes = max(max_file_bytes, size)
+            if total_bytes >= 65 << 20:  # result is 128 anyway: stop walking
+                break
+    total_dist_size = total_bytes >> 20
 
-    # Compute best dict size for compression
-    factor = 2
-    while (total_dist_size / factor > 1) and factor < 128:
-        factor *= 2
-    return "%i" % factor
+    # Compute best dict size for compression: the smallest power of 2 that
+    # is not less than the dist size
+    factor = 1 << max(1, (total_dist_size - 1).bit_length())
+    if max_file_bytes > 32 << 20:  # let large binaries fit into the window
+        factor = max(factor, 64)
+    return "%i" % min(factor, 128)
 
 
 def command_runner(
@@ -208,6 +243,22 @@ def command_runner(
         return 0, output
 
 
+def link_or_copy(source_file, dest_file):
+    """
+    Put a file into the reduced dist
+    The reduced dist is only read to build the SFX and removed afterwards, so a
+    hardlink does as well as a copy. Copy only where linking fails, e.g. on
+    another volume or an existing target.
+    """
+    try:
+        os.link(source_file, dest_file)
+    except OSError:
+        try:
+            shutil.copyfile(source_file, dest_file)
+        except shutil.SameFileError:  # linked by an earlier, aborted run
+            pass
+
+
 def reduce_nuitka_dist(source_dir, dest_dir):
     NUITKA_EXCLUDE_FILES = [
         "_asyncio.pyd",
@@ -234,12 +285,16 @@ def reduce_nuitka_dist(source_dir, dest_dir):
     dist_files = get_files_recursive(
         source_dir, NUITKA_EXCLUDE_DIRS, NUITKA_EXCLUDE_FILES
     )
-    for file in dist_files:
-        absolute_dest_filepath = file.replace(source_dir, dest_dir)
+    # all found paths start with source_dir and a separator: just slice that off
+    src_prefix_len = len(os.path.join(source_dir, ""))
+    dest_files = [os.path.join(dest_dir, file[src_prefix_len:]) for file in dist_files]
+    # create all destination directories up front, parents first
+    for dest_filedir in sorted({os.path.dirname(f) for f in dest_files}):
+        os.makedirs(dest_filedir, exist_ok=True)
 
-        if not os.path.isdir(os.path.dirname(absolute_dest_filepath)):
-            os.makedirs(os.path.dirname(absolute_dest_filepath))
-        shutil.copyfile(file, absolute_dest_filepath)
+    # file operations are I/O bound, so threads can overlap them
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+        list(pool.map(link_or_copy, dist_files, dest_files))
 
 
 def help():
@@ -375,8 +430,8 @@ if not dist_given and _GUI is True:
     window.Finalize()
 
     while True:
-        event, values = window.Read(timeout=1000)
-        if event is "OK":
+        event, values = window.Read()  # block until the user does something
+        if event == "OK":
             dist = values["dist"]
             if not os.path.isdir(dist):
                 psg.Popup("Directory [%s] does not exist" % dist)
@@ -385,7 +440,7 @@ if not dist_given and _GUI is True:
                 icon = values["icon"]
                 uac = values["uac"]
                 break
-        elif event is "Exit":
+        elif event in (None, "Exit"):  # None: window was closed
             break
 elif not dist_given:
     raise SystemExit("Cannot make one-file executable.")
@@ -416,40 +471,42 @@ sfx_outputfile = os.path.join(executable_path, executable_file)
 
 # put NSIS installation script to a file
 nsi_filename = dist + ".nsi"
-nsi_file = open(nsi_filename, "w")
-nsi_file.write(nsi)
-nsi_file.close()
+nsi_tmp_filename = nsi_filename + ".tmp"  # never leave a partial script
+with open(nsi_tmp_filename, "w", encoding="utf-8") as nsi_file:
+    nsi_file.write(nsi)
+os.replace(nsi_tmp_filename, nsi_filename)
 
-optional_args = ""
+optional_args = []
 try:
     if icon is not None and icon != "":
-        optional_args = "/DICON=%s" % icon
+        optional_args.append("/DICON=%s" % icon)
 except (NameError, ValueError, TypeError):
     pass
 
 try:
     if uac is not None and uac != "":
-        optional_args = "%s /DUAC=%s" % (optional_args, uac)
+        optional_args.append("/DUAC=%s" % uac)
 except (NameError, ValueError, TypeError):
     pass
 
-nsis_command = (
-    '"%s" /DNAME="%s" /DSFXOUTPUT="%s" /DSOURCEDIR="%s" /DSFXEXECUTABLE="%s" /DDICTSIZE="%s" %s "%s"'
-    % (
-        makensis,
-        executable_file,
-        sfx_outputfile,
-        nsi_source_dir,
-        executable_file,
-        lzma_dict_size,
-        optional_args,
-        nsi_filename,
-    )
-)
+# argument list: no shell and no manual quoting of paths needed
+nsis_command = [
+    makensis,
+    "/DNAME=%s" % executable_file,
+    "/DSFXOUTPUT=%s" % sfx_outputfile,
+    "/DSOURCEDIR=%s" % nsi_source_dir,
+    "/DSFXEXECUTABLE=%s" % executable_file,
+    "/DDICTSIZE=%s" % lzma_dict_size,
+    *optional_args,
+    nsi_filename,
+]
 
 
 t0 = time.time()
-print("Running command [%s]. Please wait, this may take some time.\n" % nsis_command)
+print(
+    "Running command [%s]. Please wait, this may take some time.\n"
+    % subprocess.list2cmdline(nsis_command)
+)
 exit_code, output = command_runner(nsis_command, timeout=900)
 
 t1 = time.time()
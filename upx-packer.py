@@ -17,7 +17,8 @@
 #
 
 from __future__ import print_function
-import sys, os, subprocess as sp, time
+import sys, os, subprocess as sp, time, array
+from concurrent.futures import ThreadPoolExecutor
 
 py2 = str is bytes  # check if Python2
 # do some adjustments whether Python v2 or v3
@@ -28,6 +29,63 @@ else:
 
 sep_line = "".ljust(80, "-")
 
+
+upx_extensions = frozenset((".exe", ".dll", ".pyd"))  # we only handle these
+upx_skip_dlls = ("python", "vcruntime", "msvcp", "cldapi", "edp")  # keep these
+
+
+def cpu_count():
+    """Number of CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))  # respects affinity / cgroups
+    except AttributeError:  # not available on Windows
+        return os.cpu_count() or 1
+
+
+def scan_binaries(bin_dir):
+    """
+    Find the binaries to compress in a folder and its sub-folders.
+    Sizes come from the directory entries, which on Windows needs no extra stat.
+    Returns (list of UPX candidates, array of their sizes, size of all other
+    files, number of files).
+    """
+    upx_files = []
+    upx_sizes = array.array("Q")  # compact, summed in C
+    other_size = 0
+    file_count = 0
+    stack = [bin_dir]  # folders still to scan
+    while stack:
+        root = stack.pop()
+        skip_root = "qt-plugins" in root.lower()
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():  # like os.walk
+                        stack.append(entry.path)
+                    continue
+                file_count += 1
+                size = entry.stat().st_size
+                f = entry.name.lower()
+                ext = f[-4:]
+                if (
+                    skip_root
+                    or ext not in upx_extensions  # we only handle these
+                    or (ext == ".dll" and f.startswith(upx_skip_dlls))
+                ):
+                    other_size += size
+                else:
+                    upx_files.append(entry.path)
+                    upx_sizes.append(size)
+    return upx_files, upx_sizes, other_size, file_count
+
+
+def run_upx(fname):
+    """Compress one binary with UPX, discarding its output. Return new size."""
+    cmd = ("upx", "-9", fname)
+    sp.run(cmd, stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+    return os.path.getsize(fname)
+
+
 print(sep_line)
 print("Checking availability of UPX:\n", end="", flush=True)
 
@@ -50,55 +108,24 @@ if not bin_dir:
 bin_dir = os.path.abspath(bin_dir)
 print("UPX Compression of binaries in folder '%s'" % bin_dir)
 
-tasks = []
-file_count = 0
-file_sizes = {}
 t0 = time.time()
-for root, _, files in os.walk(bin_dir):
-    root = root.lower()
-    for f in files:
-        f = f.lower()
-        fname = os.path.join(root, f)
-        file_sizes[fname] = os.stat(fname).st_size
-        if "qt-plugins" in root:
-            continue
-        if not f.endswith((".exe", ".dll", "pyd")):  # we only handle these
-            continue
-        if f.endswith(".dll"):
-            if f.startswith("python"):
-                continue
-            if f.startswith("vcruntime"):
-                continue
-            if f.startswith("msvcp"):
-                continue
-            if f.startswith("cldapi"):
-                continue
-            if f.startswith("edp"):
-                continue
-
-        # make the upx invocation command
-        cmd = ("upx", "-9", fname)
-        t = sp.Popen(cmd, stdout=sp.PIPE, stderr=sp.PIPE, shell=False)
-        tasks.append(t)
-        file_count += 1
+upx_files, upx_sizes, other_size, file_count = scan_binaries(bin_dir)
 
 print(
-    "Started %i compressions out of %i total files ..."
-    % (file_count, len(file_sizes.keys())),
+    "Starting %i compressions out of %i total files ..."
+    % (len(upx_files), file_count),
     flush=True,
 )
 
-for t in tasks:
-    t.wait()
+# UPX is CPU bound: run at most one process per usable CPU
+with ThreadPoolExecutor(max_workers=cpu_count()) as pool:
+    new_sizes = array.array("Q", pool.map(run_upx, upx_files))
 
 t1 = int(round(time.time() - t0))
 print("Finished in %i seconds." % t1, flush=True)
-old_size = new_size = 0.0
-for f in file_sizes.keys():
-    old_size += file_sizes[f]
-    new_size += os.stat(f).st_size
-old_size *= 1.0 / 1024 / 1024
-new_size *= 1.0 / 1024 / 1024
+# byte totals are summed as integers, then converted to MB once
+old_size = (other_size + sum(upx_sizes)) / (1024 * 1024)
+new_size = (other_size + sum(new_sizes)) / (1024 * 1024)
 diff_size = old_size - new_size
 diff_percent = diff_size / old_size * 100
 text = "\nFolder Compression Results (MB)\nbefore: %.2f\nafter: %.2f\nsavings: %.2f (%.1f%%)"
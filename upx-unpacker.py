@@ -18,28 +18,33 @@
 
 from __future__ import print_function
 import sys, os, subprocess as sp, time
-
-py2 = str is bytes                    # check if Python2
-# do some adjustments whether Python v2 or v3
-if not py2:
-    import PySimpleGUI as psg
-else:
-    import PySimpleGUI27 as psg
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sep_line = "".ljust(80, "-")
+upx_extensions = frozenset((".exe", ".dll", ".pyd"))  # we only handle these
+# pure data folders, which Nuitka puts at the top level of a dist folder
+skip_dirs = frozenset(("certifi", "tzdata"))
+
+print(sep_line)
+print("Checking availability of UPX:\n", end="", flush=True)
 
 try:
-    print(sep_line)
-    print("Checking availability of UPX:\n", end="", flush=True)
     rc = sp.call(("upx", "-qq"))                # test presence of upx
-    print("OK: UPX is available.")
-    print(sep_line)
-except:
+except FileNotFoundError:
     raise SystemExit("UPX not installed or missing in path definition")
 
+print("OK: UPX is available.")
+print(sep_line)
+
 try:
     bin_dir = sys.argv[1]
-except:
+except IndexError:
+    # the GUI is only needed (and imported) when no folder was given
+    py2 = str is bytes                    # check if Python2
+    if not py2:
+        import PySimpleGUI as psg
+    else:
+        import PySimpleGUI27 as psg
     bin_dir = psg.PopupGetFolder("UPX De-Compression of binaries",
                                 "Enter folder:")
 
@@ -49,37 +54,115 @@ if not bin_dir:
 bin_dir = os.path.abspath(bin_dir)
 print("UPX De-Compression of binaries in folder '%s'" % bin_dir)
 
-tasks = []
-file_count = 0
-file_sizes = {}
-t0 = time.time()
-for root, _, files in os.walk(bin_dir):
-    for f in files:
-        f = f.lower()        # lower casing file name (it's Windows, stupid!)
-        fname = os.path.join(root, f)
-        file_sizes[fname] = os.stat(fname).st_size
-        if not f.endswith((".exe", ".dll", "pyd")):   # we only handle these
-            continue
-        # make the upx invocation commannd
-        cmd = ('upx', '-d', fname)
-        t = sp.Popen(cmd, stdout=sp.PIPE, stderr=sp.PIPE, shell=False)
-        tasks.append(t)
-        file_count += 1
-
-print("Started %i de-compressions out of %i total files ..." % (file_count, len(file_sizes.keys())), flush=True)
-
-for t in tasks:
-    t.wait()
-
-t1 = int(round(time.time() - t0))
-print("Finished in %i seconds." % t1, flush=True)
-old_size = new_size = 0.0
-for f in file_sizes.keys():
-    old_size += file_sizes[f]
-    new_size += os.stat(f).st_size
-old_size *= 1./1024/1024
-new_size *= 1./1024/1024
+
+def walk_files(folder, skipped=None):
+    """
+    Yield the DirEntry of every file in a folder and its sub-folders.
+    If a 'skipped' list is given, sub-folders of this folder named in
+    skip_dirs are left out and their names are appended to the list.
+    """
+    with os.scandir(folder) as entries:  # file type and size come with the entry
+        for e in entries:
+            if e.is_dir(follow_symlinks=False):
+                if skipped is not None and e.name.lower() in skip_dirs:
+                    skipped.append(e.name)
+                else:
+                    yield from walk_files(e.path)
+            elif e.is_file():  # not linked folders, like os.walk
+                yield e
+
+
+def scan_binaries(bin_dir):
+    """
+    Find the binaries to de-compress in a folder and its sub-folders.
+    Data-only top level folders (skip_dirs) are not scanned.
+    Returns (list of binaries, size of all files, size of all other files,
+    number of files, names of skipped folders). A function, so the loop
+    works with local variables only.
+    """
+    upx_files = []
+    skipped = []
+    total_size = 0
+    other_size = 0
+    total_count = 0
+    for entry in walk_files(bin_dir, skipped):
+        total_count += 1
+        # lower casing the extension only (it's Windows, stupid!)
+        if entry.name[-4:].lower() not in upx_extensions:  # we only handle these
+            # only counted for the folder totals: free on Windows
+            other_size += entry.stat(follow_symlinks=False).st_size
+        else:
+            upx_files.append(entry.path)
+            total_size += entry.stat(follow_symlinks=False).st_size
+    total_size += other_size
+    return upx_files, total_size, other_size, total_count, skipped
+
+
+def cpu_count():
+    """Number of CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))  # respects affinity / cgroups
+    except AttributeError:  # not available on Windows
+        return os.cpu_count() or 1
+
+
+def is_upx_packed(fname):
+    """
+    Check for the UPX marks which packed binaries carry in their header.
+    Unreadable files count as packed: UPX then reports the problem itself.
+    """
+    try:
+        with open(fname, "rb") as f:
+            head = f.read(4096)
+    except OSError:  # locked, no permission, broken link, ...
+        return True
+    return b"UPX!" in head or b"UPX0" in head
+
+
+def run_upx(fnames):
+    """
+    De-compress a batch of binaries with one UPX process, discarding its
+    output. Return the new total size of the batch.
+    """
+    packed = tuple(f for f in fnames if is_upx_packed(f))
+    if packed:  # no process for a batch of only unpacked files
+        cmd = ("upx", "-d") + packed
+        sp.run(cmd, stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+    # new size of the batch, taken like the old one (no link following)
+    return sum(os.stat(f, follow_symlinks=False).st_size for f in fnames)
+
+
+t0 = time.perf_counter()  # monotonic, high resolution
+upx_files, old_size, other_size, total_count, skipped = scan_binaries(bin_dir)
+file_count = len(upx_files)
+
+print("Starting %i de-compressions out of %i total files ..." % (file_count, total_count), flush=True)
+
+# UPX is CPU bound: run at most one process per usable CPU.
+# Several files go to each process to save process starts, but keep at
+# least two batches per worker so the pool stays busy.
+workers = cpu_count()
+batch_size = max(1, min(32, file_count // (2 * workers)))
+batches = [upx_files[i : i + batch_size] for i in range(0, file_count, batch_size)]
+new_size = other_size
+done_count = 0
+with ThreadPoolExecutor(max_workers=workers) as pool:
+    # the new sizes are taken in the workers, overlapping the other batches
+    futures = {pool.submit(run_upx, b): len(b) for b in batches}
+    for future in as_completed(futures):  # in order of completion
+        new_size += future.result()  # re-raises any worker exception
+        done_count += futures[future]
+        print("%i / %i files done" % (done_count, file_count), end="\r", flush=True)
+print()
+
+t1 = time.perf_counter() - t0
+print("Finished in %.1f seconds." % t1, flush=True)
+# byte totals are summed as integers, then converted to MB once
+old_size /= 1024 * 1024
+new_size /= 1024 * 1024
 diff_size = new_size - old_size
 diff_percent = diff_size / old_size * 100
 text = "\nFolder De-Compression Results (MB)\nbefore: %.2f\nafter: %.2f\ngrowth: %.2f (%.1f%%)"
 print(text % (old_size, new_size, diff_size, diff_percent))
+if skipped:  # these were not scanned, so they are not in the figures above
+    print("(not included, no binaries: %s)" % ", ".join(sorted(skipped)))